@@ -22,6 +22,9 @@ AMADEUS_BASE_URL = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com")
 
 # Google Maps
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY", "")
+GEOCODE_TIMEOUT = float(os.getenv("GEOCODE_TIMEOUT", "3"))
+GEOCODE_BREAKER_THRESHOLD = int(os.getenv("GEOCODE_BREAKER_THRESHOLD", "5"))
+GEOCODE_BREAKER_COOLDOWN = float(os.getenv("GEOCODE_BREAKER_COOLDOWN", "30"))
 
 # AI Model
 AI_MODEL = os.getenv("AI_MODEL", "gpt-oss-120b")
@@ -30,6 +33,10 @@ AI_TEMPERATURE = float(os.getenv("AI_TEMPERATURE", "0.5"))
 
 # Mock API
 MOCK_DELAYS = os.getenv("MOCK_DELAYS", "false").lower() in ("true", "1", "yes")
+MOCK_SEED = os.getenv("MOCK_SEED") or None
+
+# Logging (DEBUG also dumps the rendered SWML for every request)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
 # Server
 HOST = os.getenv("HOST", "0.0.0.0")
@@ -8,24 +8,31 @@ v1 pricing, v1 flight-orders).  When MOCK_DELAYS=true, each call sleeps
 1-9 s to simulate real-world Amadeus/GDS latency.
 """
 
+import heapq
 import math
 import random
+import secrets
 import string
 import time
 import zoneinfo
 from datetime import datetime, timedelta
-from uuid import uuid4
+from functools import lru_cache
+from types import MappingProxyType
 
 import config
 
+# Private generator for all mock data; set MOCK_SEED for reproducible runs.
+_rng = random.Random(config.MOCK_SEED)
+
+
 def _maybe_delay(lo=1, hi=5):
     """Sleep for a random interval when MOCK_DELAYS is enabled."""
     if config.MOCK_DELAYS:
-        time.sleep(random.uniform(lo, hi))
+        time.sleep(_rng.uniform(lo, hi))
 
 # ── Airport database ──────────────────────────────────────────────────
 
-AIRPORTS = {
+AIRPORTS = MappingProxyType({
     # ── US — Top 50 + notable secondary ──────────────────────────────
     "ATL": {"iata": "ATL", "name": "Hartsfield-Jackson Atlanta International", "city": "Atlanta", "lat": 33.6407, "lng": -84.4277, "tz": "America/New_York"},
     "LAX": {"iata": "LAX", "name": "Los Angeles International", "city": "Los Angeles", "lat": 33.9425, "lng": -118.4081, "tz": "America/Los_Angeles"},
@@ -112,7 +119,6 @@ AIRPORTS = {
     "XNA": {"iata": "XNA", "name": "Northwest Arkansas National", "city": "Fayetteville", "lat": 36.2819, "lng": -94.3068, "tz": "America/Chicago"},
     "ONT": {"iata": "ONT", "name": "Ontario International", "city": "Ontario", "lat": 34.0560, "lng": -117.6012, "tz": "America/Los_Angeles"},
     "PSP": {"iata": "PSP", "name": "Palm Springs International", "city": "Palm Springs", "lat": 33.8297, "lng": -116.5067, "tz": "America/Los_Angeles"},
-    "OGG": {"iata": "OGG", "name": "Kahului", "city": "Maui", "lat": 20.8986, "lng": -156.4305, "tz": "Pacific/Honolulu"},
     "KOA": {"iata": "KOA", "name": "Ellison Onizuka Kona International", "city": "Kona", "lat": 19.7388, "lng": -156.0456, "tz": "Pacific/Honolulu"},
     "LIH": {"iata": "LIH", "name": "Lihue", "city": "Kauai", "lat": 21.9760, "lng": -159.3390, "tz": "Pacific/Honolulu"},
 
@@ -233,7 +239,7 @@ AIRPORTS = {
     "NBO": {"iata": "NBO", "name": "Jomo Kenyatta International", "city": "Nairobi", "lat": -1.3192, "lng": 36.9278, "tz": "Africa/Nairobi"},
     "LOS": {"iata": "LOS", "name": "Murtala Muhammed International", "city": "Lagos", "lat": 6.5774, "lng": 3.3211, "tz": "Africa/Lagos"},
     "CPT": {"iata": "CPT", "name": "Cape Town International", "city": "Cape Town", "lat": -33.9649, "lng": 18.6017, "tz": "Africa/Johannesburg"},
-}
+})
 
 # Size tier for relevance scoring (higher = busier)
 _AIRPORT_TIERS = {
@@ -283,9 +289,27 @@ _AIRPORT_TIERS = {
     "CPT": 19,
 }
 
+# Airport codes ordered busiest-first (ties keep table order), so keyword
+# search can stop at the first five matches instead of sorting them all.
+_AIRPORTS_BY_TIER = tuple(sorted(AIRPORTS, key=lambda c: -_AIRPORT_TIERS.get(c, 10)))
+
+# (iata, haystack) in the same order.  The haystack is code, name and city
+# lowercased and NUL-joined, so one `in` test covers all three fields
+# without a keyword matching across field boundaries.
+_SEARCH_ROWS = tuple(
+    (iata, "\0".join((iata, AIRPORTS[iata]["name"], AIRPORTS[iata]["city"])).lower())
+    for iata in _AIRPORTS_BY_TIER
+)
+
+# Upper-cased (name, city) for Amadeus-style location records
+_UPPER_NAMES = {
+    iata: (info["name"].upper(), info["city"].upper())
+    for iata, info in AIRPORTS.items()
+}
+
 # ── Airline database ─────────────────────────────────────────────────
 
-AIRLINES = {
+AIRLINES = MappingProxyType({
     "UA": "United Airlines",
     "DL": "Delta Air Lines",
     "AA": "American Airlines",
@@ -315,14 +339,16 @@ AIRLINES = {
     "AR": "Aerolineas Argentinas",
     "G3": "Gol Linhas Aereas",
     "Y4": "Volaris",
-}
+})
+
+_ALL_AIRLINE_CODES = tuple(AIRLINES)
 
-AIRCRAFT = ["738", "739", "320", "321", "77W", "789", "359", "388"]
+AIRCRAFT = ("738", "739", "320", "321", "77W", "789", "359", "388")
 
 # Hub airports for generating connections
-HUBS = ["ORD", "DFW", "ATL", "DEN", "IAH", "CLT", "PHX", "MSP", "DTW", "EWR",
+HUBS = ("ORD", "DFW", "ATL", "DEN", "IAH", "CLT", "PHX", "MSP", "DTW", "EWR",
         "LHR", "FRA", "AMS", "IST", "DXB", "SIN", "NRT", "ICN",
-        "MEX", "PTY", "BOG", "GRU", "SCL", "LIM", "EZE"]
+        "MEX", "PTY", "BOG", "GRU", "SCL", "LIM", "EZE")
 
 # Cabin class multipliers
 CABIN_MULTIPLIERS = {
@@ -332,6 +358,13 @@ CABIN_MULTIPLIERS = {
     "FIRST": 6.0,
 }
 
+# Base fare tiers: (distance below, per-mile rate, fixed overhead)
+_BASE_PRICE_TIERS = (
+    (500, 0.25, 50),        # short haul premium
+    (1500, 0.18, 30),       # medium haul
+    (math.inf, 0.12, 80),   # long haul
+)
+
 CABIN_BAGS = {
     "ECONOMY": 0,
     "PREMIUM_ECONOMY": 1,
@@ -349,9 +382,12 @@ CABIN_BOOKING_CLASS = {
 
 # ── Utility functions ────────────────────────────────────────────────
 
+_EARTH_RADIUS_MI = 3959
+
+
 def _haversine_miles(lat1, lng1, lat2, lng2):
     """Great-circle distance in miles."""
-    R = 3959
+    R = _EARTH_RADIUS_MI
     dlat = math.radians(lat2 - lat1)
     dlng = math.radians(lng2 - lng1)
     a = (math.sin(dlat / 2) ** 2 +
@@ -360,11 +396,47 @@ def _haversine_miles(lat1, lng1, lat2, lng2):
     return R * 2 * math.asin(math.sqrt(a))
 
 
+def _route_miles(a, b):
+    """Great-circle miles between two airports by IATA code."""
+    return _pair_miles(a, b) if a <= b else _pair_miles(b, a)
+
+
+@lru_cache(maxsize=4096)
+def _pair_miles(a, b):
+    # Distance is symmetric; _route_miles orders the pair so A-B and B-A
+    # share one cache entry.
+    pa, pb = AIRPORTS[a], AIRPORTS[b]
+    return _haversine_miles(pa["lat"], pa["lng"], pb["lat"], pb["lng"])
+
+
+# (iata, info, lat_rad, lng_rad, cos_lat) per airport, built once so the
+# nearest-airport scan skips per-airport degree conversion and cos().
+_AIRPORT_GEO = tuple(
+    (iata, info, math.radians(info["lat"]), math.radians(info["lng"]),
+     math.cos(math.radians(info["lat"])))
+    for iata, info in AIRPORTS.items()
+)
+
+
+# One ZoneInfo per distinct airport timezone, resolved per airport at
+# import so schedule generation never touches tz strings or tzdata.
+_ZONES = {tz: zoneinfo.ZoneInfo(tz) for tz in {a["tz"] for a in AIRPORTS.values()}}
+AIRPORT_TZ = {iata: _ZONES[info["tz"]] for iata, info in AIRPORTS.items()}
+_CENTRAL = _ZONES["America/Chicago"]
+
+
 def _flight_duration_minutes(distance_miles):
     """Estimate flight time: ~500 mph cruise + 30 min taxi/climb/descent."""
     return int(distance_miles / 500 * 60) + 30
 
 
+def _base_price(distance_miles):
+    """One-way economy base fare from _BASE_PRICE_TIERS."""
+    for limit, per_mile, fixed in _BASE_PRICE_TIERS:
+        if distance_miles < limit:
+            return distance_miles * per_mile + fixed
+
+
 def _format_iso_duration(minutes):
     """Convert minutes to ISO 8601 duration string."""
     h, m = divmod(minutes, 60)
@@ -373,31 +445,34 @@ def _format_iso_duration(minutes):
     return f"PT{h}H"
 
 
-def _make_times(origin_tz, dest_tz, departure_date, depart_hour, flight_minutes):
-    """Generate departure and arrival ISO strings in local time."""
-    dep_tz = zoneinfo.ZoneInfo(origin_tz)
-    arr_tz = zoneinfo.ZoneInfo(dest_tz)
+def _make_times(dep_tz, arr_tz, departure_day, depart_hour, flight_minutes):
+    """Generate departure and arrival ISO strings in local time.
 
-    dep_local = datetime.strptime(departure_date, "%Y-%m-%d").replace(
-        hour=depart_hour, minute=0, tzinfo=dep_tz
-    )
+    dep_tz/arr_tz are ZoneInfo objects (see AIRPORT_TZ); departure_day is
+    a naive midnight datetime parsed once per search.
+    """
+    dep_local = departure_day.replace(hour=depart_hour, minute=0, tzinfo=dep_tz)
     arr_utc = dep_local + timedelta(minutes=flight_minutes)
     arr_local = arr_utc.astimezone(arr_tz)
 
+    # isoformat() is C-level; the first 19 chars drop the UTC offset
     return (
-        dep_local.strftime("%Y-%m-%dT%H:%M:%S"),
-        arr_local.strftime("%Y-%m-%dT%H:%M:%S"),
+        dep_local.isoformat(timespec="seconds")[:19],
+        arr_local.isoformat(timespec="seconds")[:19],
     )
 
 
 def _random_flight_number():
     """Generate a random 3-4 digit flight number."""
-    return str(random.randint(100, 9999))
+    return str(_rng.randint(100, 9999))
+
+
+_PNR_ALPHABET = tuple(string.ascii_uppercase + string.digits)
 
 
 def _random_pnr():
     """Generate a 6-character alphanumeric PNR code."""
-    return "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
+    return "".join(_rng.choices(_PNR_ALPHABET, k=6))
 
 
 _AIRLINE_HUBS = {
@@ -439,16 +514,17 @@ _AIRLINE_HUBS = {
     "AR": {"EZE"},
     "G3": {"GRU", "GIG"},
 }
+_AIRLINE_HUBS = MappingProxyType({code: frozenset(hubs) for code, hubs in _AIRLINE_HUBS.items()})
 
-_US_ZONES = {
+_US_ZONES = frozenset({
     "America/New_York", "America/Chicago", "America/Denver",
     "America/Los_Angeles", "America/Phoenix", "America/Detroit",
     "America/Indiana/Indianapolis", "America/Anchorage", "Pacific/Honolulu",
     "America/Boise", "America/Kentucky/Louisville",
     "America/Puerto_Rico", "America/Virgin",
-}
+})
 
-_LATAM_ZONES = {
+_LATAM_ZONES = frozenset({
     "America/Mexico_City", "America/Cancun", "America/Monterrey",
     "America/Mazatlan", "America/Costa_Rica", "America/Panama",
     "America/Guatemala", "America/El_Salvador", "America/Belize",
@@ -459,91 +535,119 @@ _LATAM_ZONES = {
     "America/Bogota", "America/Lima", "America/Santiago",
     "America/Guayaquil", "America/Caracas", "America/Montevideo",
     "America/Asuncion", "America/La_Paz",
-}
+})
 
-_CANADA_ZONES = {"America/Toronto", "America/Vancouver", "America/Edmonton"}
+_CANADA_ZONES = frozenset({"America/Toronto", "America/Vancouver", "America/Edmonton"})
 
 
-def _pick_airlines_for_route(origin, dest, count=3):
-    """Pick plausible airlines for a route, preferring hub carriers."""
-    # Find airlines that hub at origin or destination
-    hub_carriers = []
-    for code, hubs in _AIRLINE_HUBS.items():
-        if origin in hubs or dest in hubs:
-            hub_carriers.append(code)
-    random.shuffle(hub_carriers)
+def _regions(tz):
+    """Region tags for a timezone name, as used to choose carrier pools."""
+    tags = set()
+    if tz in _US_ZONES:
+        tags.add("us")
+    if tz in _LATAM_ZONES:
+        tags.add("latam")
+    if tz in _CANADA_ZONES:
+        tags.add("canada")
+    if "Europe" in tz or "Atlantic" in tz:
+        tags.add("europe")
+    if "Asia" in tz:
+        tags.add("asia")
+    if "Australia" in tz or "Pacific" in tz:
+        tags.add("oceania")
+    return frozenset(tags)
+
+
+_AIRPORT_REGIONS = {iata: _regions(info["tz"]) for iata, info in AIRPORTS.items()}
+
+# Airport -> carriers that hub there (inverse of _AIRLINE_HUBS)
+_HUBS_BY_AIRPORT = {}
+for _code, _hubs in _AIRLINE_HUBS.items():
+    for _hub in _hubs:
+        _HUBS_BY_AIRPORT.setdefault(_hub, set()).add(_code)
+_HUBS_BY_AIRPORT = {iata: frozenset(codes) for iata, codes in _HUBS_BY_AIRPORT.items()}
+
+
+@lru_cache(maxsize=4096)
+def _route_carriers(origin, dest):
+    """Return (hub_carriers, regional_pool) for a route, both as tuples.
+
+    Everything here depends only on the two airports, so it is computed
+    once per route; the random picks happen in _pick_airlines_for_route.
+    """
+    # Airlines that hub at origin or destination, in _AIRLINE_HUBS order
+    hubs = _HUBS_BY_AIRPORT.get(origin, frozenset()) | _HUBS_BY_AIRPORT.get(dest, frozenset())
+    hub_carriers = tuple(code for code in _AIRLINE_HUBS if code in hubs)
 
     # Determine regional pool as fallback
-    o = AIRPORTS.get(origin, {})
-    d = AIRPORTS.get(dest, {})
-    o_tz = o.get("tz", "")
-    d_tz = d.get("tz", "")
-
-    o_us = o_tz in _US_ZONES
-    d_us = d_tz in _US_ZONES
-    o_latam = o_tz in _LATAM_ZONES
-    d_latam = d_tz in _LATAM_ZONES
-    o_canada = d_tz in _CANADA_ZONES
-    d_canada = d_tz in _CANADA_ZONES
-    o_europe = "Europe" in o_tz or "Atlantic" in o_tz
-    d_europe = "Europe" in d_tz or "Atlantic" in d_tz
-    o_asia = "Asia" in o_tz
-    d_asia = "Asia" in d_tz
-    o_oceania = "Australia" in o_tz or "Pacific" in o_tz
-    d_oceania = "Australia" in d_tz or "Pacific" in d_tz
-
-    if o_us and d_us:
-        pool = ["UA", "DL", "AA", "WN", "AS", "B6", "NK", "F9"]
-    elif (o_us or d_us) and (o_latam or d_latam):
-        pool = ["AA", "UA", "DL", "AM", "AV", "CM", "LA", "B6", "WN", "Y4"]
-    elif o_latam and d_latam:
-        pool = ["AM", "AV", "LA", "CM", "AR", "G3", "Y4", "AA", "UA"]
-    elif (o_us or d_us) and (o_europe or d_europe):
-        pool = ["UA", "DL", "AA", "BA", "LH", "AF", "KL", "IB", "AC", "TK"]
-    elif (o_us or d_us) and (o_asia or d_asia):
-        pool = ["UA", "DL", "AA", "NH", "JL", "KE", "SQ", "AS", "EK", "QR"]
-    elif (o_us or d_us) and (o_canada or d_canada):
-        pool = ["AC", "UA", "DL", "AA", "WN", "AS"]
-    elif o_europe and d_europe:
-        pool = ["BA", "LH", "AF", "KL", "IB", "TK"]
-    elif o_asia and d_asia:
-        pool = ["NH", "JL", "KE", "SQ", "EK", "QR", "TK"]
+    o = _AIRPORT_REGIONS.get(origin, frozenset())
+    d = _AIRPORT_REGIONS.get(dest, frozenset())
+    either = o | d
+    o_tz = AIRPORTS.get(origin, {}).get("tz", "")
+    d_tz = AIRPORTS.get(dest, {}).get("tz", "")
+
+    if "us" in o and "us" in d:
+        pool = ("UA", "DL", "AA", "WN", "AS", "B6", "NK", "F9")
+    elif "us" in either and "latam" in either:
+        pool = ("AA", "UA", "DL", "AM", "AV", "CM", "LA", "B6", "WN", "Y4")
+    elif "latam" in o and "latam" in d:
+        pool = ("AM", "AV", "LA", "CM", "AR", "G3", "Y4", "AA", "UA")
+    elif "us" in either and "europe" in either:
+        pool = ("UA", "DL", "AA", "BA", "LH", "AF", "KL", "IB", "AC", "TK")
+    elif "us" in either and "asia" in either:
+        pool = ("UA", "DL", "AA", "NH", "JL", "KE", "SQ", "AS", "EK", "QR")
+    elif "us" in either and "canada" in either:
+        pool = ("AC", "UA", "DL", "AA", "WN", "AS")
+    elif "europe" in o and "europe" in d:
+        pool = ("BA", "LH", "AF", "KL", "IB", "TK")
+    elif "asia" in o and "asia" in d:
+        pool = ("NH", "JL", "KE", "SQ", "EK", "QR", "TK")
     elif "Asia/Dubai" in (o_tz, d_tz) or "Asia/Qatar" in (o_tz, d_tz):
-        pool = ["EK", "QR", "TK", "BA", "LH"]
-    elif o_oceania or d_oceania:
-        pool = ["QF", "UA", "DL", "NH", "SQ"]
+        pool = ("EK", "QR", "TK", "BA", "LH")
+    elif "oceania" in either:
+        pool = ("QF", "UA", "DL", "NH", "SQ")
     else:
-        pool = list(AIRLINES.keys())
+        pool = _ALL_AIRLINE_CODES
+
+    return hub_carriers, pool
+
+
+def _pick_airlines_for_route(origin, dest, count=3):
+    """Pick plausible airlines for a route, preferring hub carriers."""
+    hub_carriers, pool = _route_carriers(origin, dest)
 
     # Build result: hub carriers first, then fill from pool
-    result = []
-    for c in hub_carriers:
-        if len(result) >= count:
-            break
-        result.append(c)
+    result = _rng.sample(hub_carriers, min(count, len(hub_carriers)))
 
-    remaining = [c for c in pool if c not in result]
-    random.shuffle(remaining)
-    for c in remaining:
-        if len(result) >= count:
-            break
-        result.append(c)
+    if len(result) < count:
+        picked = set(result)
+        remaining = [c for c in pool if c not in picked]
+        result += _rng.sample(remaining, min(count - len(result), len(remaining)))
 
     # Fallback if we still don't have enough
     if len(result) < count:
-        extras = [c for c in AIRLINES if c not in result]
-        random.shuffle(extras)
-        result.extend(extras[:count - len(result)])
+        picked = set(result)
+        extras = [c for c in _ALL_AIRLINE_CODES if c not in picked]
+        result += _rng.sample(extras, min(count - len(result), len(extras)))
 
-    return result[:count]
+    return result
 
 
-def _pick_connection_hub(origin, dest):
-    """Pick a geographically reasonable hub between origin and dest."""
-    o = AIRPORTS.get(origin)
-    d = AIRPORTS.get(dest)
-    if not o or not d:
-        return random.choice(HUBS)
+# (hub, lat, lng) for every hub in the airport table
+_HUB_COORDS = tuple(
+    (hub, AIRPORTS[hub]["lat"], AIRPORTS[hub]["lng"]) for hub in HUBS if hub in AIRPORTS
+)
+
+
+@lru_cache(maxsize=4096)
+def _hub_candidates(origin, dest):
+    """Return (candidates, fallback) connection hubs for a known route.
+
+    candidates are the hubs inside the route's padded bounding box;
+    fallback is the hub nearest the midpoint, used when there are none.
+    """
+    o = AIRPORTS[origin]
+    d = AIRPORTS[dest]
 
     # Bounding box between origin and dest (with margin)
     lat_min = min(o["lat"], d["lat"]) - 10
@@ -551,39 +655,53 @@ def _pick_connection_hub(origin, dest):
     lng_min = min(o["lng"], d["lng"]) - 15
     lng_max = max(o["lng"], d["lng"]) + 15
 
-    candidates = []
-    for hub in HUBS:
-        if hub in (origin, dest):
-            continue
-        h = AIRPORTS.get(hub)
-        if not h:
-            continue
-        if lat_min <= h["lat"] <= lat_max and lng_min <= h["lng"] <= lng_max:
-            candidates.append(hub)
+    hubs = [h for h in _HUB_COORDS if h[0] != origin and h[0] != dest]
+    candidates = tuple(
+        hub for hub, lat, lng in hubs
+        if lat_min <= lat <= lat_max and lng_min <= lng <= lng_max
+    )
+    if candidates:
+        return candidates, None
+
+    # Fallback: pick hub closest to midpoint
+    mid_lat = (o["lat"] + d["lat"]) / 2
+    mid_lng = (o["lng"] + d["lng"]) / 2
+    best = None
+    best_dist = float("inf")
+    for hub, lat, lng in hubs:
+        dist = _haversine_miles(mid_lat, mid_lng, lat, lng)
+        if dist < best_dist:
+            best_dist = dist
+            best = hub
+    return (), best or "ORD"
 
+
+def _pick_connection_hub(origin, dest):
+    """Pick a geographically reasonable hub between origin and dest."""
+    if origin not in AIRPORTS or dest not in AIRPORTS:
+        return _rng.choice(HUBS)
+
+    candidates, fallback = _hub_candidates(origin, dest)
     if not candidates:
-        # Fallback: pick hub closest to midpoint
-        mid_lat = (o["lat"] + d["lat"]) / 2
-        mid_lng = (o["lng"] + d["lng"]) / 2
-        best = None
-        best_dist = float("inf")
-        for hub in HUBS:
-            if hub in (origin, dest):
-                continue
-            h = AIRPORTS.get(hub)
-            if not h:
-                continue
-            dist = _haversine_miles(mid_lat, mid_lng, h["lat"], h["lng"])
-            if dist < best_dist:
-                best_dist = dist
-                best = hub
-        return best or "ORD"
-
-    return random.choice(candidates)
+        return fallback
+    return _rng.choice(candidates)
 
 
 # ── Mock API functions ───────────────────────────────────────────────
 
+def _location(iata, relevance):
+    """Amadeus-style location record for a keyword search hit."""
+    name, city = _UPPER_NAMES[iata]
+    return {
+        "iataCode": iata,
+        "name": name,
+        "subType": "AIRPORT",
+        "address": {"cityName": city},
+        "analytics": {"travelers": {"score": _AIRPORT_TIERS.get(iata, 10)}},
+        "relevance": relevance,
+    }
+
+
 def mock_search_airports(keyword):
     """Fuzzy match on IATA code, airport name, and city name.
 
@@ -594,28 +712,25 @@ def mock_search_airports(keyword):
         return []
 
     keyword_lower = keyword.lower()
+    exact = keyword.upper()
+    if exact not in AIRPORTS:
+        exact = None
     results = []
 
-    for iata, info in AIRPORTS.items():
+    # Exact IATA match always ranks first
+    if exact:
+        results.append(_location(exact, 100.0))
+
+    # Relevance is 50 + tier, so scanning busiest-first yields matches
+    # already in rank order and we can stop at five.
+    for iata, haystack in _SEARCH_ROWS:
+        if len(results) >= 5:
+            break
         # Check IATA code, name, and city
-        if (keyword_lower in iata.lower() or
-                keyword_lower in info["name"].lower() or
-                keyword_lower in info["city"].lower()):
-            score = _AIRPORT_TIERS.get(iata, 10)
-            # Boost exact IATA match
-            relevance = 100.0 if keyword_lower == iata.lower() else 50.0 + score
-            results.append({
-                "iataCode": iata,
-                "name": info["name"].upper(),
-                "subType": "AIRPORT",
-                "address": {"cityName": info["city"].upper()},
-                "analytics": {"travelers": {"score": score}},
-                "relevance": relevance,
-            })
+        if keyword_lower in haystack and iata != exact:
+            results.append(_location(iata, 50.0 + _AIRPORT_TIERS.get(iata, 10)))
 
-    # Sort by relevance descending
-    results.sort(key=lambda x: x["relevance"], reverse=True)
-    return results[:5]
+    return results
 
 
 def mock_get_airport(iata):
@@ -629,24 +744,29 @@ def mock_nearest_airports(lat, lng):
     Returns top 5 sorted by distance, formatted like Amadeus.
     """
     _maybe_delay(1, 5)
+    lat1 = math.radians(lat)
+    lng1 = math.radians(lng)
+    cos1 = math.cos(lat1)
+    sin, asin, sqrt = math.sin, math.asin, math.sqrt
+    diameter = 2 * _EARTH_RADIUS_MI
     distances = []
-    for iata, info in AIRPORTS.items():
-        dist = _haversine_miles(lat, lng, info["lat"], info["lng"])
-        distances.append((iata, info, dist))
+    for iata, info, lat2, lng2, cos2 in _AIRPORT_GEO:
+        a = sin((lat2 - lat1) / 2) ** 2 + cos1 * cos2 * sin((lng2 - lng1) / 2) ** 2
+        distances.append((iata, info, diameter * asin(sqrt(a))))
 
-    distances.sort(key=lambda x: x[2])
     results = []
-    for iata, info, dist in distances[:5]:
+    for iata, info, dist in heapq.nsmallest(5, distances, key=lambda x: x[2]):
         # Cap at 75 miles — matches Amadeus radius=100km behavior.
         # Beyond this, airports are in a different city/metro area.
         if dist > 75:
             continue
         relevance = max(1, int(100 * math.exp(-dist / 50)))
+        name, city = _UPPER_NAMES[iata]
         results.append({
             "iataCode": iata,
-            "name": info["name"].upper(),
+            "name": name,
             "subType": "AIRPORT",
-            "address": {"cityName": info["city"].upper()},
+            "address": {"cityName": city},
             "analytics": {"travelers": {"score": _AIRPORT_TIERS.get(iata, 10)}},
             "relevance": relevance,
             "distance": {"value": round(dist, 1), "unit": "MI"},
@@ -667,21 +787,27 @@ def mock_search_flights(origin, destination, departure_date, return_date=None,
     if not o or not d:
         return [], {}, cabin_class
 
-    distance = _haversine_miles(o["lat"], o["lng"], d["lat"], d["lng"])
+    # Parse dates once; every segment's times are built from these
+    departure_day = datetime.strptime(departure_date, "%Y-%m-%d")
+    return_day = datetime.strptime(return_date, "%Y-%m-%d") if return_date else None
+
+    # Per-route constants shared by every offer
+    distance = _route_miles(origin, destination)
     base_minutes = _flight_duration_minutes(distance)
+    base_price = _base_price(distance) * CABIN_MULTIPLIERS.get(cabin_class, 1.0)
+    o_tz = AIRPORT_TZ[origin]
+    d_tz = AIRPORT_TZ[destination]
 
     # Determine nonstop vs 1-stop mix
     is_short_route = distance < 1200
-    num_offers = min(random.randint(3, 5), max_results)
+    num_offers = min(_rng.randint(3, 5), max_results)
 
     airlines = _pick_airlines_for_route(origin, destination, count=3)
-    used_carriers = {}
-    for code in airlines:
-        used_carriers[code] = AIRLINES.get(code, code)
+    used_carriers = {code: AIRLINES.get(code, code) for code in airlines}
 
     # Departure time slots (hours in local time)
     time_slots = [6, 8, 10, 13, 16, 19, 21]
-    random.shuffle(time_slots)
+    _rng.shuffle(time_slots)
 
     offers = []
     for i in range(num_offers):
@@ -690,52 +816,36 @@ def mock_search_flights(origin, destination, departure_date, return_date=None,
 
         # Nonstop vs 1-stop
         if is_short_route:
-            is_nonstop = random.random() < 0.8
+            is_nonstop = _rng.random() < 0.8
         else:
-            is_nonstop = random.random() < 0.4
+            is_nonstop = _rng.random() < 0.4
 
         itineraries = []
 
         # ── Build outbound itinerary ──
-        outbound_segments = _build_segments(
-            origin, destination, departure_date, depart_hour,
+        outbound_segments, outbound_total_min = _build_segments(
+            origin, destination, o_tz, d_tz, departure_day, depart_hour,
             base_minutes, airline, is_nonstop
         )
-        outbound_total_min = sum(
-            s["_duration_min"] for s in outbound_segments
-        )
         itineraries.append({
             "duration": _format_iso_duration(outbound_total_min),
-            "segments": [{k: v for k, v in s.items() if k != "_duration_min"}
-                         for s in outbound_segments],
+            "segments": outbound_segments,
         })
 
         # ── Build return itinerary if round-trip ──
         if return_date:
-            ret_hour = random.choice([h for h in time_slots if h != depart_hour] or [10])
-            ret_nonstop = is_nonstop if random.random() < 0.7 else (not is_nonstop)
-            return_segments = _build_segments(
-                destination, origin, return_date, ret_hour,
+            ret_hour = _rng.choice([h for h in time_slots if h != depart_hour] or [10])
+            ret_nonstop = is_nonstop if _rng.random() < 0.7 else (not is_nonstop)
+            return_segments, return_total_min = _build_segments(
+                destination, origin, d_tz, o_tz, return_day, ret_hour,
                 base_minutes, airline, ret_nonstop
             )
-            return_total_min = sum(
-                s["_duration_min"] for s in return_segments
-            )
             itineraries.append({
                 "duration": _format_iso_duration(return_total_min),
-                "segments": [{k: v for k, v in s.items() if k != "_duration_min"}
-                             for s in return_segments],
+                "segments": return_segments,
             })
 
-        # ── Price calculation (tiered per-mile + fixed overhead) ──
-        if distance < 500:
-            base_price = distance * 0.25 + 50   # short haul premium
-        elif distance < 1500:
-            base_price = distance * 0.18 + 30   # medium haul
-        else:
-            base_price = distance * 0.12 + 80   # long haul
-        cabin_mult = CABIN_MULTIPLIERS.get(cabin_class, 1.0)
-
+        # ── Price calculation (tiered base fare × cabin, per route) ──
         # Time-of-day adjustment
         if depart_hour < 7 or depart_hour > 20:
             time_mult = 0.85  # red-eye discount
@@ -747,9 +857,9 @@ def mock_search_flights(origin, destination, departure_date, return_date=None,
         # 1-stop discount
         stop_mult = 0.80 if not is_nonstop else 1.0
 
-        price = base_price * cabin_mult * time_mult * stop_mult
+        price = base_price * time_mult * stop_mult
         # Random variance ±15%
-        price *= random.uniform(0.85, 1.15)
+        price *= _rng.uniform(0.85, 1.15)
         # Round-trip multiplier
         if return_date:
             price *= 1.8
@@ -757,25 +867,26 @@ def mock_search_flights(origin, destination, departure_date, return_date=None,
         # Per-person pricing
         price = max(price, 89.0)  # minimum fare
         total = round(price, 2)
+        total_str = f"{total:.2f}"
 
         offer = {
-            "id": str(i + 1),
+            "id": None,  # assigned after sorting by price
             "source": "GDS",
             "lastTicketingDate": departure_date,
-            "numberOfBookableSeats": random.randint(3, 9),
+            "numberOfBookableSeats": _rng.randint(3, 9),
             "itineraries": itineraries,
             "price": {
                 "currency": "USD",
-                "total": f"{total:.2f}",
-                "grandTotal": f"{total:.2f}",
+                "total": total_str,
+                "grandTotal": total_str,
             },
             "validatingAirlineCodes": [airline],
         }
-        offers.append(offer)
+        offers.append((total, offer))
 
-    # Sort by price
-    offers.sort(key=lambda x: float(x["price"]["grandTotal"]))
-    # Re-number IDs after sort
+    # Sort on the numeric total, then number IDs in price order
+    offers.sort(key=lambda x: x[0])
+    offers = [offer for _, offer in offers]
     for i, offer in enumerate(offers):
         offer["id"] = str(i + 1)
 
@@ -783,44 +894,43 @@ def mock_search_flights(origin, destination, departure_date, return_date=None,
     return offers, dictionaries, cabin_class
 
 
-def _build_segments(origin, dest, date, depart_hour, base_minutes, airline, is_nonstop):
-    """Build segment list for one direction of travel."""
-    o = AIRPORTS.get(origin, {})
-    d = AIRPORTS.get(dest, {})
-    o_tz = o.get("tz", "America/New_York")
-    d_tz = d.get("tz", "America/New_York")
+def _build_segments(origin, dest, o_tz, d_tz, day, depart_hour, base_minutes,
+                    airline, is_nonstop):
+    """Build segment list for one direction of travel.
 
+    Per-route values (zones, nonstop minutes) are resolved once by the
+    caller.  Returns (segments, total_minutes), where total_minutes
+    includes any layover.
+    """
     if is_nonstop:
-        dep_str, arr_str = _make_times(o_tz, d_tz, date, depart_hour, base_minutes)
+        dep_str, arr_str = _make_times(o_tz, d_tz, day, depart_hour, base_minutes)
         return [{
             "departure": {"iataCode": origin, "at": dep_str},
             "arrival": {"iataCode": dest, "at": arr_str},
             "carrierCode": airline,
             "number": _random_flight_number(),
-            "aircraft": {"code": random.choice(AIRCRAFT)},
+            "aircraft": {"code": _rng.choice(AIRCRAFT)},
             "operating": {"carrierCode": airline},
-            "_duration_min": base_minutes,
-        }]
+        }], base_minutes
 
     # 1-stop: pick a hub
     hub = _pick_connection_hub(origin, dest)
-    hub_info = AIRPORTS.get(hub, {})
-    hub_tz = hub_info.get("tz", "America/Chicago")
+    hub_tz = AIRPORT_TZ.get(hub, _CENTRAL)
 
     # Leg 1: origin → hub
-    dist1 = _haversine_miles(o["lat"], o["lng"], hub_info["lat"], hub_info["lng"])
+    dist1 = _route_miles(origin, hub)
     leg1_min = _flight_duration_minutes(dist1)
-    dep1_str, arr1_str = _make_times(o_tz, hub_tz, date, depart_hour, leg1_min)
+    dep1_str, arr1_str = _make_times(o_tz, hub_tz, day, depart_hour, leg1_min)
 
     # Layover: 1-3 hours
-    layover_min = random.randint(60, 180)
+    layover_min = _rng.randint(60, 180)
 
     # Leg 2: hub → dest
-    dist2 = _haversine_miles(hub_info["lat"], hub_info["lng"], d["lat"], d["lng"])
+    dist2 = _route_miles(hub, dest)
     leg2_min = _flight_duration_minutes(dist2)
     leg2_depart_hour = depart_hour + (leg1_min + layover_min) // 60
     leg2_depart_hour = leg2_depart_hour % 24
-    dep2_str, arr2_str = _make_times(hub_tz, d_tz, date, leg2_depart_hour, leg2_min)
+    dep2_str, arr2_str = _make_times(hub_tz, d_tz, day, leg2_depart_hour, leg2_min)
 
     total_min = leg1_min + layover_min + leg2_min
 
@@ -830,20 +940,18 @@ def _build_segments(origin, dest, date, depart_hour, base_minutes, airline, is_n
             "arrival": {"iataCode": hub, "at": arr1_str},
             "carrierCode": airline,
             "number": _random_flight_number(),
-            "aircraft": {"code": random.choice(AIRCRAFT)},
+            "aircraft": {"code": _rng.choice(AIRCRAFT)},
             "operating": {"carrierCode": airline},
-            "_duration_min": total_min,  # full trip time on first segment for duration calc
         },
         {
             "departure": {"iataCode": hub, "at": dep2_str},
             "arrival": {"iataCode": dest, "at": arr2_str},
             "carrierCode": airline,
             "number": _random_flight_number(),
-            "aircraft": {"code": random.choice(AIRCRAFT)},
+            "aircraft": {"code": _rng.choice(AIRCRAFT)},
             "operating": {"carrierCode": airline},
-            "_duration_min": 0,  # counted in first segment
         },
-    ]
+    ], total_min
 
 
 def mock_price_offer(offer):
@@ -854,7 +962,7 @@ def mock_price_offer(offer):
     """
     _maybe_delay(1, 5)
     # Slight price bump
-    bump = random.uniform(1.00, 1.03)
+    bump = _rng.uniform(1.00, 1.03)
     original_price = float(offer.get("price", {}).get("grandTotal", "0"))
     new_price = round(original_price * bump, 2)
 
@@ -900,7 +1008,7 @@ def mock_create_order(offer, travelers):
     """
     _maybe_delay(4, 9)
     return {
-        "id": f"VO{uuid4().hex[:8].upper()}",
+        "id": f"VO{secrets.token_hex(4).upper()}",
         "type": "flight-order",
         "associatedRecords": [
             {
@@ -5,12 +5,17 @@ and into a local SQLite database keyed by call_id. Keeps global_data under
 ~1KB with only what the AI needs for conversation.
 """
 
-import json
 import logging
+import os
+import queue
 import sqlite3
+import threading
 import time
+from contextlib import contextmanager
 from pathlib import Path
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).parent / "voyager_state.db"
@@ -63,6 +68,23 @@ CREATE TABLE IF NOT EXISTS passengers (
 CREATE INDEX IF NOT EXISTS idx_passengers_phone ON passengers(phone);
 """
 
+# Applied once per pooled connection.  WAL + synchronous=NORMAL fsyncs
+# only at checkpoints; busy_timeout waits out another process's write
+# lock in C instead of failing with SQLITE_BUSY.  auto_vacuum has to come
+# before journal_mode and only takes effect on a fresh database; it lets
+# cleanup_stale_states() hand freed pages back in small steps.
+_PRAGMAS = """
+PRAGMA auto_vacuum=INCREMENTAL;
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA wal_autocheckpoint=1000;
+PRAGMA busy_timeout=5000;
+PRAGMA cache_size=-20000;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA foreign_keys=ON;
+"""
+
 DEFAULT_STATE = {
     "origin": None,
     "destination": None,
@@ -80,44 +102,122 @@ DEFAULT_STATE = {
 }
 
 
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def _init_schema(conn):
+    """Create tables and run migrations, once per process."""
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        conn.executescript(_CREATE_TABLES)
+        # Migration: add legs_json to existing databases that lack it
+        try:
+            conn.execute("ALTER TABLE bookings ADD COLUMN legs_json TEXT")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        _schema_ready = True
+
+
 def _connect():
-    """Open a new connection with WAL mode (cheap, thread-safe for ASGI)."""
-    conn = sqlite3.connect(str(DB_PATH), timeout=5)
+    """Open a new pooled connection with WAL mode and server pragmas.
+
+    check_same_thread is off because pooled connections move between
+    request threads; the pool guarantees one user at a time.  Autocommit
+    mode (isolation_level=None) leaves transaction control to _conn().
+    """
+    conn = sqlite3.connect(str(DB_PATH), timeout=5, check_same_thread=False,
+                           isolation_level=None)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.executescript(_CREATE_TABLES)
-    # Migration: add legs_json to existing databases that lack it
-    try:
-        conn.execute("ALTER TABLE bookings ADD COLUMN legs_json TEXT")
-        conn.commit()
-    except sqlite3.OperationalError:
-        pass  # Column already exists
+    conn.executescript(_PRAGMAS)
+    if not _schema_ready:
+        _init_schema(conn)
     return conn
 
 
+class _Pool:
+    """Bounded pool of SQLite connections, opened on first demand.
+
+    Connections are reused across calls, so the file open and pragma setup
+    are paid once per connection instead of once per query.
+    """
+
+    def __init__(self, size):
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return _connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn):
+        self._idle.put(conn)
+        self._slots.release()
+
+
+# One writer so our own threads never race each other for SQLite's write
+# lock; WAL lets the readers run alongside it.
+_write_pool = _Pool(1)
+_read_pool = _Pool(min(8, os.cpu_count() or 4))
+
+
+@contextmanager
+def _conn(write=False):
+    """Borrow a pooled connection.
+
+    Writes run inside BEGIN IMMEDIATE so the write lock is taken up front:
+    a competing writer waits in busy_timeout instead of failing with
+    SQLITE_BUSY on a read-to-write upgrade.  Committed on success, rolled
+    back on error.  Reads run in autocommit.
+    """
+    pool = _write_pool if write else _read_pool
+    conn = pool.acquire()
+    try:
+        if write:
+            conn.execute("BEGIN IMMEDIATE")
+        yield conn
+        if write:
+            conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        pool.release(conn)
+
+
 def load_call_state(call_id):
     """Return the full state dict for a call, or defaults if missing."""
-    conn = _connect()
-    try:
+    with _conn(write=False) as conn:
         row = conn.execute(
             "SELECT state_json FROM call_state WHERE call_id = ?", (call_id,)
         ).fetchone()
-        if row:
-            state = json.loads(row[0])
-            # Merge with defaults so new keys are always present
-            merged = {**DEFAULT_STATE, **state}
-            return merged
-        return dict(DEFAULT_STATE)
-    finally:
-        conn.close()
+    merged = DEFAULT_STATE.copy()
+    if row:
+        # Merge with defaults so new keys are always present
+        merged.update(orjson.loads(row[0]))
+    return merged
 
 
 def save_call_state(call_id, state):
-    """Upsert the JSON blob for a call."""
+    """Upsert the JSON blob for a call.
+
+    Stored as TEXT (not orjson's raw bytes) so the column stays readable
+    by SQLite's JSON functions.
+    """
     now = time.time()
-    blob = json.dumps(state, default=str)
-    conn = _connect()
-    try:
+    blob = orjson.dumps(state, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    with _conn(write=True) as conn:
         conn.execute(
             """INSERT INTO call_state (call_id, state_json, created_at, updated_at)
                VALUES (?, ?, ?, ?)
@@ -126,35 +226,88 @@ def save_call_state(call_id, state):
                    updated_at = excluded.updated_at""",
             (call_id, blob, now, now),
         )
-        conn.commit()
-    finally:
-        conn.close()
+
+
+def _json_path(key):
+    return f'$."{key}"'
+
+
+def set_call_state_flag(call_id, key):
+    """Set a top-level flag to true unless it is already set.
+
+    One statement edits the stored JSON in place, so nothing is decoded or
+    re-encoded.  Returns True if this call set the flag, False if it was
+    already set.
+    """
+    now = time.time()
+    path = _json_path(key)
+    with _conn(write=True) as conn:
+        rows = conn.execute(
+            """INSERT INTO call_state (call_id, state_json, created_at, updated_at)
+               VALUES (?, json_object(?, json('true')), ?, ?)
+               ON CONFLICT(call_id) DO UPDATE SET
+                   state_json = json_set(call_state.state_json, ?, json('true')),
+                   updated_at = excluded.updated_at
+               WHERE NOT IFNULL(json_extract(call_state.state_json, ?), 0)
+               RETURNING call_id""",
+            (call_id, key, now, now, path, path),
+        ).fetchall()
+    return bool(rows)
+
+
+def pop_call_state_fields(call_id, *keys):
+    """Remove top-level keys from a call's stored state, in place."""
+    if not keys:
+        return
+    paths = ", ".join("?" * len(keys))
+    with _conn(write=True) as conn:
+        conn.execute(
+            f"UPDATE call_state SET state_json = json_remove(state_json, {paths}), "
+            f"updated_at = ? WHERE call_id = ?",
+            (*map(_json_path, keys), time.time(), call_id),
+        )
 
 
 def delete_call_state(call_id):
     """Remove a call's state after the call ends."""
-    conn = _connect()
-    try:
+    with _conn(write=True) as conn:
         conn.execute("DELETE FROM call_state WHERE call_id = ?", (call_id,))
-        conn.commit()
-        logger.info(f"Deleted state for call_id={call_id}")
-    finally:
-        conn.close()
+    logger.info(f"Deleted state for call_id={call_id}")
 
 
 def cleanup_stale_states(max_age_hours=24):
-    """Prune abandoned calls older than max_age_hours."""
+    """Prune abandoned calls older than max_age_hours.
+
+    Reclaims at most 256 freed pages per run; a full VACUUM would block
+    every writer for as long as it takes to rewrite the file.
+    """
     cutoff = time.time() - (max_age_hours * 3600)
-    conn = _connect()
-    try:
+    with _conn(write=True) as conn:
         cursor = conn.execute(
             "DELETE FROM call_state WHERE updated_at < ?", (cutoff,)
         )
-        conn.commit()
-        if cursor.rowcount:
-            logger.info(f"Cleaned up {cursor.rowcount} stale call states")
-    finally:
-        conn.close()
+    if cursor.rowcount > 0:
+        # executescript() steps the pragma to completion (execute() frees a
+        # single page).  It commits any open transaction first, so it runs
+        # on the writer connection directly rather than inside _conn().
+        conn = _write_pool.acquire()
+        try:
+            conn.executescript("PRAGMA incremental_vacuum(256)")
+        finally:
+            _write_pool.release(conn)
+        logger.info(f"Cleaned up {cursor.rowcount} stale call states")
+
+
+# Scalar/text fields copied into the AI summary when set.  Flight
+# summaries are text only, booking carries the PNR/details read back to
+# the caller; the heavy offer objects never leave SQLite.
+_SUMMARY_FIELDS = (
+    "origin", "destination",
+    "origin_candidates", "destination_candidates",
+    "trip_type", "departure_date", "return_date", "adults", "cabin_class",
+    "flight_summaries", "flight_summary",
+    "confirmed_price", "booking",
+)
 
 
 def build_ai_summary(state):
@@ -163,51 +316,13 @@ def build_ai_summary(state):
     Only includes what the AI needs to conduct the conversation.
     Heavy objects (flight_offer, priced_offer) stay in SQLite only.
     """
-    summary = {}
-
-    # Origin/destination — AI needs these to talk about the trip
-    if state.get("origin"):
-        summary["origin"] = state["origin"]
-    if state.get("destination"):
-        summary["destination"] = state["destination"]
-
-    # Candidates for disambiguation
-    if state.get("origin_candidates"):
-        summary["origin_candidates"] = state["origin_candidates"]
-    if state.get("destination_candidates"):
-        summary["destination_candidates"] = state["destination_candidates"]
-
-    # Travel params
-    if state.get("trip_type"):
-        summary["trip_type"] = state["trip_type"]
-    if state.get("departure_date"):
-        summary["departure_date"] = state["departure_date"]
-    if state.get("return_date"):
-        summary["return_date"] = state["return_date"]
-    if state.get("adults"):
-        summary["adults"] = state["adults"]
-    if state.get("cabin_class"):
-        summary["cabin_class"] = state["cabin_class"]
+    summary = {k: v for k in _SUMMARY_FIELDS if (v := state.get(k))}
 
     # Status flags — AI knows whether pricing/offer exist without the data
     summary["has_flight_offers"] = bool(state.get("flight_offers"))
     summary["has_flight_offer"] = state.get("flight_offer") is not None
     summary["has_priced_offer"] = state.get("priced_offer") is not None
 
-    # Flight summaries — AI reads these to the caller (text only, not heavy JSON)
-    if state.get("flight_summaries"):
-        summary["flight_summaries"] = state["flight_summaries"]
-    if state.get("flight_summary"):
-        summary["flight_summary"] = state["flight_summary"]
-
-    # Confirmed price scalar
-    if state.get("confirmed_price"):
-        summary["confirmed_price"] = state["confirmed_price"]
-
-    # Booking info — AI reads PNR/details to caller
-    if state.get("booking"):
-        summary["booking"] = state["booking"]
-
     return summary
 
 
@@ -218,8 +333,7 @@ def save_booking(call_id, pnr, passenger_name, email, phone,
                  departure_date, return_date, cabin_class, price, currency="USD",
                  legs_json=None):
     """Insert a completed booking record."""
-    conn = _connect()
-    try:
+    with _conn(write=True) as conn:
         conn.execute(
             """INSERT INTO bookings
                (call_id, pnr, passenger_name, email, phone,
@@ -232,49 +346,45 @@ def save_booking(call_id, pnr, passenger_name, email, phone,
              departure_date, return_date, cabin_class, price, currency,
              legs_json),
         )
-        conn.commit()
-        logger.info(f"Saved booking PNR={pnr} for call_id={call_id}")
-    finally:
-        conn.close()
+    logger.info(f"Saved booking PNR={pnr} for call_id={call_id}")
 
 
-def get_all_bookings():
-    """Return all bookings ordered by most recent first (for dashboard)."""
-    conn = _connect()
-    try:
-        rows = conn.execute(
-            "SELECT * FROM bookings ORDER BY created_at DESC"
-        ).fetchall()
-        bookings = [dict(r) for r in rows]
-        for b in bookings:
-            if b.get("legs_json"):
-                b["legs"] = json.loads(b["legs_json"])
-            else:
-                b["legs"] = []
-        return bookings
-    finally:
-        conn.close()
+def get_all_bookings(limit=None, offset=0):
+    """Return bookings ordered by most recent first (for dashboard).
+
+    limit/offset page through the table; by default every row is returned.
+    """
+    sql = "SELECT * FROM bookings ORDER BY created_at DESC"
+    params = ()
+    if limit is not None or offset:
+        sql += " LIMIT ? OFFSET ?"
+        params = (-1 if limit is None else limit, offset)
+    with _conn(write=False) as conn:
+        cursor = conn.execute(sql, params)
+        columns = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+    bookings = [dict(zip(columns, r)) for r in rows]
+    for b in bookings:
+        legs_json = b["legs_json"]
+        b["legs"] = orjson.loads(legs_json) if legs_json else []
+    return bookings
 
 
 # --- Passenger profiles ---
 
 def get_passenger_by_phone(phone):
     """Lookup a passenger by phone number. Returns dict or None."""
-    conn = _connect()
-    try:
+    with _conn(write=False) as conn:
         row = conn.execute(
             "SELECT * FROM passengers WHERE phone = ?", (phone,)
         ).fetchone()
         return dict(row) if row else None
-    finally:
-        conn.close()
 
 
 def create_passenger(phone, first_name, last_name, **optional):
     """Upsert a passenger. COALESCE keeps existing values when new ones are None."""
-    conn = _connect()
-    try:
-        conn.execute(
+    with _conn(write=True) as conn:
+        rows = conn.execute(
             """INSERT INTO passengers
                (phone, first_name, last_name, date_of_birth, gender,
                 email, seat_preference, cabin_preference,
@@ -290,7 +400,8 @@ def create_passenger(phone, first_name, last_name, **optional):
                    cabin_preference   = COALESCE(excluded.cabin_preference, passengers.cabin_preference),
                    home_airport_iata  = COALESCE(excluded.home_airport_iata, passengers.home_airport_iata),
                    home_airport_name  = COALESCE(excluded.home_airport_name, passengers.home_airport_name),
-                   updated_at         = datetime('now')""",
+                   updated_at         = datetime('now')
+               RETURNING *""",
             (
                 phone,
                 first_name,
@@ -303,12 +414,9 @@ def create_passenger(phone, first_name, last_name, **optional):
                 optional.get("home_airport_iata"),
                 optional.get("home_airport_name"),
             ),
-        )
-        conn.commit()
-        logger.info(f"Upserted passenger phone={phone}")
-        return get_passenger_by_phone(phone)
-    finally:
-        conn.close()
+        ).fetchall()
+    logger.info(f"Upserted passenger phone={phone}")
+    return dict(rows[0])
 
 
 def update_passenger(phone, **fields):
@@ -323,14 +431,12 @@ def update_passenger(phone, **fields):
         return get_passenger_by_phone(phone)
     set_clause = ", ".join(f"{k} = ?" for k in updates)
     values = list(updates.values()) + [phone]
-    conn = _connect()
-    try:
-        conn.execute(
-            f"UPDATE passengers SET {set_clause}, updated_at = datetime('now') WHERE phone = ?",
+    # fetchall() steps RETURNING to completion before _conn() commits.
+    with _conn(write=True) as conn:
+        rows = conn.execute(
+            f"UPDATE passengers SET {set_clause}, updated_at = datetime('now') "
+            f"WHERE phone = ? RETURNING *",
             values,
-        )
-        conn.commit()
-        logger.info(f"Updated passenger phone={phone}, fields={list(updates.keys())}")
-        return get_passenger_by_phone(phone)
-    finally:
-        conn.close()
+        ).fetchall()
+    logger.info(f"Updated passenger phone={phone}, fields={list(updates.keys())}")
+    return dict(rows[0]) if rows else None
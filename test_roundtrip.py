@@ -5,9 +5,14 @@ Tests: search → price → SQLite round-trip → book
 Reports working routes for both round-trip and one-way.
 """
 
-import json
-import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.error import URLError
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import config
 from amadeus import Client, ResponseError
@@ -17,6 +22,10 @@ CALL_ID = "test-route-scan"
 DEPARTURE = "2026-08-01"
 RETURN_DATE = "2026-08-05"
 CABIN = "ECONOMY"
+# Routes are I/O-bound on the sandbox; workers share one rate limiter so
+# the total request rate stays under its per-second quota.
+SCAN_WORKERS = 4
+SANDBOX_RPS = 5
 
 # Major routes likely to have sandbox coverage
 ROUTES = [
@@ -47,6 +56,26 @@ ROUTES = [
     ("MCO", "JFK"),
 ]
 
+# Fixed search fields shared by every route; test_route() only adds the
+# per-route codes (and returnDate for round-trips).
+SEARCH_DEFAULTS = {
+    'departureDate': DEPARTURE,
+    'adults': 1,
+    'travelClass': CABIN,
+    'max': 3,
+    'currencyCode': 'USD',
+}
+
+ORDER_TICKETING = {
+    'option': 'DELAY_TO_CANCEL',
+    'delay': '6D',
+}
+ORDER_REMARKS = {
+    'general': [
+        {'subType': 'GENERAL_MISCELLANEOUS', 'text': 'VOYAGER TEST'}
+    ]
+}
+
 TRAVELERS = [{
     "id": "1",
     "dateOfBirth": "1990-01-01",
@@ -59,39 +88,109 @@ TRAVELERS = [{
 }]
 
 
-def create_order(client, offer, travelers):
+# Booking contact for the test traveler; the same for every order.
+CONTACTS = [{
+    "addresseeName": {
+        "firstName": TRAVELERS[0]["name"]["firstName"],
+        "lastName": TRAVELERS[0]["name"]["lastName"],
+    },
+    "purpose": "STANDARD",
+    "address": {
+        "lines": ["123 Main St"],
+        "postalCode": "00000",
+        "cityName": "New York",
+        "countryCode": "US",
+    },
+    "emailAddress": TRAVELERS[0]["contact"]["emailAddress"],
+    "phones": TRAVELERS[0]["contact"]["phones"],
+}]
+
+
+class RateLimiter:
+    """Space calls at least 1/rps seconds apart across all threads.
+
+    Only sleeps when a caller arrives ahead of its slot, so an idle scanner
+    never waits.
+    """
+
+    def __init__(self, rps):
+        self.interval = 1 / rps
+        self.next = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            wait = max(0, self.next - now)
+            self.next = max(now, self.next) + self.interval
+        time.sleep(wait)
+
+
+_limiter = RateLimiter(SANDBOX_RPS)
+# Separate from the route pool so a route waiting on its pricing attempts
+# never holds the worker those attempts need.
+_pricing_pool = ThreadPoolExecutor(max_workers=SCAN_WORKERS * SEARCH_DEFAULTS['max'])
+
+# Keep-alive pool shared by every worker, sized for all route and pricing
+# threads, so TLS is negotiated once per connection instead of per call.
+# Only GETs are retried; bookings must never be sent twice.
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=SCAN_WORKERS * (1 + SEARCH_DEFAULTS['max']),
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset(["GET"]), raise_on_status=False),
+))
+
+
+class _PooledResponse:
+    """The slice of http.client.HTTPResponse the amadeus SDK reads."""
+
+    def __init__(self, response):
+        self.status = self.code = response.status_code
+        self._response = response
+
+    def getheaders(self):
+        return list(self._response.headers.items())
+
+    def info(self):
+        # The SDK prefers info() over getheaders() and looks up
+        # 'Content-Type' by exact case; requests' headers are
+        # case-insensitive, like urlopen's HTTPMessage.
+        return self._response.headers
+
+    def read(self):
+        return self._response.content
+
+
+def pooled_http(request):
+    """amadeus `http` hook: send the SDK's urllib Request over _http.
+
+    Network failures are re-raised as URLError, which the SDK turns into
+    its own NetworkError.
+    """
+    try:
+        response = _http.request(
+            request.get_method(), request.full_url,
+            data=request.data, headers=dict(request.header_items()), timeout=30,
+        )
+    except requests.RequestException as e:
+        raise URLError(e) from e
+    return _PooledResponse(response)
+
+
+def create_order(client, offer, travelers, contacts=CONTACTS):
     """Book using the official SDK."""
-    contacts = [{
-        "addresseeName": {
-            "firstName": travelers[0]["name"]["firstName"],
-            "lastName": travelers[0]["name"]["lastName"],
-        },
-        "purpose": "STANDARD",
-        "address": {
-            "lines": ["123 Main St"],
-            "postalCode": "00000",
-            "cityName": "New York",
-            "countryCode": "US",
-        },
-        "emailAddress": travelers[0]["contact"]["emailAddress"],
-        "phones": travelers[0]["contact"]["phones"],
-    }]
     try:
+        _limiter.acquire()
         response = client.post('/v1/booking/flight-orders', {
             'data': {
                 'type': 'flight-order',
                 'flightOffers': [offer],
                 'travelers': travelers,
                 'contacts': contacts,
-                'ticketingAgreement': {
-                    'option': 'DELAY_TO_CANCEL',
-                    'delay': '6D',
-                },
-                'remarks': {
-                    'general': [
-                        {'subType': 'GENERAL_MISCELLANEOUS', 'text': 'VOYAGER TEST'}
-                    ]
-                },
+                'ticketingAgreement': ORDER_TICKETING,
+                'remarks': ORDER_REMARKS,
             }
         })
         return response.data
@@ -99,30 +198,47 @@ def create_order(client, offer, travelers):
         return None
 
 
+def price_offer(client, offer, settled=None):
+    """Price one offer; returns the priced offer or None.
+
+    Skips the request if `settled` is set by the time a rate-limit slot
+    comes up (another attempt for the same route already won).
+    """
+    try:
+        _limiter.acquire()
+        if settled is not None and settled.is_set():
+            return None
+        priced_data = client.shopping.flight_offers.pricing.post(offer).data
+    except ResponseError:
+        return None
+    if priced_data and priced_data.get("flightOffers"):
+        return priced_data["flightOffers"][0]
+    return None
+
+
 def test_route(client, origin, dest, return_date=None):
     """Test search → price → SQLite round-trip → book for a route.
 
     Returns dict with results for each stage.
     """
     mode = "RT" if return_date else "OW"
+    # Routes run concurrently, so each gets its own state row.
+    call_id = f"{CALL_ID}-{origin}{dest}-{mode}"
     result = {"route": f"{origin}→{dest}", "mode": mode,
               "search": False, "price": False, "sqlite": False, "book": False,
               "pnr": None, "offers": 0, "error": None, "segments": ""}
 
     # 1. Search
     params = {
+        **SEARCH_DEFAULTS,
         'originLocationCode': origin,
         'destinationLocationCode': dest,
-        'departureDate': DEPARTURE,
-        'adults': 1,
-        'travelClass': CABIN,
-        'max': 3,
-        'currencyCode': 'USD',
     }
     if return_date:
         params['returnDate'] = return_date
 
     try:
+        _limiter.acquire()
         response = client.shopping.flight_offers_search.get(**params)
         offers = response.data
     except ResponseError as e:
@@ -147,18 +263,17 @@ def test_route(client, origin, dest, return_date=None):
             segs.append(f"{cc}{num} {dep}→{arr}")
     result["segments"] = " | ".join(segs)
 
-    # 2. Price — try each offer until one works
+    # 2. Price — all offers at once; keep the first (cheapest) that works
+    settled = threading.Event()
+    attempts = [_pricing_pool.submit(price_offer, client, offer, settled) for offer in offers]
     priced_offer = None
-    for i, offer in enumerate(offers):
-        if i > 0:
-            time.sleep(0.5)
-        try:
-            priced_data = client.shopping.flight_offers.pricing.post(offer).data
-            if priced_data and priced_data.get("flightOffers"):
-                priced_offer = priced_data["flightOffers"][0]
-                break
-        except ResponseError:
-            continue
+    for attempt in attempts:
+        priced_offer = attempt.result()
+        if priced_offer:
+            break
+    settled.set()
+    for attempt in attempts:
+        attempt.cancel()
 
     if not priced_offer:
         result["error"] = "price: all offers failed"
@@ -166,26 +281,24 @@ def test_route(client, origin, dest, return_date=None):
 
     result["price"] = True
 
-    # 3. SQLite round-trip
-    delete_call_state(CALL_ID)
+    # 3. SQLite round-trip (save is an upsert; no delete needed first)
     state = {"priced_offer": priced_offer}
-    save_call_state(CALL_ID, state)
-    loaded = load_call_state(CALL_ID)
+    save_call_state(call_id, state)
+    loaded = load_call_state(call_id)
     loaded_offer = loaded.get("priced_offer")
 
-    orig_json = json.dumps(priced_offer, sort_keys=True)
-    loaded_json = json.dumps(loaded_offer, sort_keys=True)
-    result["sqlite"] = (orig_json == loaded_json)
+    # Deep dict equality catches any changed value or structure without
+    # re-serializing either side.
+    result["sqlite"] = (loaded_offer == priced_offer)
 
     if not result["sqlite"]:
         result["error"] = "sqlite: data changed after round-trip"
-        delete_call_state(CALL_ID)
+        delete_call_state(call_id)
         return result
 
     # 4. Book with SQLite-loaded offer
-    time.sleep(0.5)
     order = create_order(client, loaded_offer, TRAVELERS)
-    delete_call_state(CALL_ID)
+    delete_call_state(call_id)
 
     if order:
         result["book"] = True
@@ -196,12 +309,30 @@ def test_route(client, origin, dest, return_date=None):
     return result
 
 
+_YESNO = {True: "YES", False: " - "}
+
+
+def _format_table(title, results):
+    """Render one results section as a single string (one write to stdout)."""
+    lines = [
+        "\n" + "=" * 80,
+        f"  {title}",
+        "=" * 80,
+        f"  {'Route':<12} {'Search':>6} {'Price':>6} {'SQLite':>6} {'Book':>6}  {'PNR':<8}  Segments",
+        "  " + "-" * 76,
+    ]
+    for r in results:
+        lines.append(f"  {r['route']:<12} {_YESNO[bool(r['search'])]:>6} {_YESNO[bool(r['price'])]:>6} {_YESNO[bool(r['sqlite'])]:>6} {_YESNO[bool(r['book'])]:>6}  {r['pnr'] or '':.<8}  {r['segments'][:50]}")
+    return "\n".join(lines)
+
+
 def main():
     config.validate()
     client = Client(
         client_id=config.AMADEUS_CLIENT_ID,
         client_secret=config.AMADEUS_CLIENT_SECRET,
         hostname='test' if 'test' in config.AMADEUS_BASE_URL else 'production',
+        http=pooled_http,
     )
 
     print("=" * 80)
@@ -210,48 +341,40 @@ def main():
     print(f"  Routes to test: {len(ROUTES)}")
     print("=" * 80)
 
-    rt_results = []
-    ow_results = []
-
-    for i, (origin, dest) in enumerate(ROUTES):
-        pct = f"[{i+1}/{len(ROUTES)}]"
-
-        # Round-trip
-        print(f"\n{pct} {origin}→{dest} round-trip ... ", end="", flush=True)
-        time.sleep(0.6)
-        rt = test_route(client, origin, dest, return_date=RETURN_DATE)
-        status = "BOOK" if rt["book"] else ("PRICE" if rt["price"] else ("SEARCH" if rt["search"] else "FAIL"))
-        pnr_info = f" PNR:{rt['pnr']}" if rt["pnr"] else ""
-        print(f"{status}{pnr_info}")
-        rt_results.append(rt)
-
-        # One-way
-        print(f"{pct} {origin}→{dest} one-way ... ", end="", flush=True)
-        time.sleep(0.6)
-        ow = test_route(client, origin, dest, return_date=None)
-        status = "BOOK" if ow["book"] else ("PRICE" if ow["price"] else ("SEARCH" if ow["search"] else "FAIL"))
-        pnr_info = f" PNR:{ow['pnr']}" if ow["pnr"] else ""
-        print(f"{status}{pnr_info}")
-        ow_results.append(ow)
+    # One cheap authenticated call up front so the SDK caches its OAuth
+    # token before the workers start; otherwise each of them would see no
+    # token and fetch its own.  All workers then share this one client.
+    try:
+        _limiter.acquire()
+        client.reference_data.locations.get(keyword="JFK", subType="AIRPORT")
+    except ResponseError as e:
+        print(f"\n  Authentication failed: {e}")
+        return
 
-    # Summary
-    print("\n" + "=" * 80)
-    print("  ROUND-TRIP RESULTS")
-    print("=" * 80)
-    print(f"  {'Route':<12} {'Search':>6} {'Price':>6} {'SQLite':>6} {'Book':>6}  {'PNR':<8}  Segments")
-    print("  " + "-" * 76)
-    for r in rt_results:
-        check = lambda v: "YES" if v else " - "
-        print(f"  {r['route']:<12} {check(r['search']):>6} {check(r['price']):>6} {check(r['sqlite']):>6} {check(r['book']):>6}  {r['pnr'] or '':.<8}  {r['segments'][:50]}")
+    # Round-trip and one-way for every route, scanned concurrently.  Results
+    # are slotted back by index so the summary keeps ROUTES order.
+    tasks = [(origin, dest, ret) for origin, dest in ROUTES for ret in (RETURN_DATE, None)]
+    results = [None] * len(tasks)
 
-    print("\n" + "=" * 80)
-    print("  ONE-WAY RESULTS")
-    print("=" * 80)
-    print(f"  {'Route':<12} {'Search':>6} {'Price':>6} {'SQLite':>6} {'Book':>6}  {'PNR':<8}  Segments")
-    print("  " + "-" * 76)
-    for r in ow_results:
-        check = lambda v: "YES" if v else " - "
-        print(f"  {r['route']:<12} {check(r['search']):>6} {check(r['price']):>6} {check(r['sqlite']):>6} {check(r['book']):>6}  {r['pnr'] or '':.<8}  {r['segments'][:50]}")
+    print()
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as ex:
+        futures = {
+            ex.submit(test_route, client, origin, dest, return_date=ret): i
+            for i, (origin, dest, ret) in enumerate(tasks)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            r = results[futures[future]] = future.result()
+            kind = "round-trip" if r["mode"] == "RT" else "one-way"
+            status = "BOOK" if r["book"] else ("PRICE" if r["price"] else ("SEARCH" if r["search"] else "FAIL"))
+            pnr_info = f" PNR:{r['pnr']}" if r["pnr"] else ""
+            print(f"[{done}/{len(tasks)}] {r['route']} {kind} ... {status}{pnr_info}")
+
+    rt_results = results[0::2]
+    ow_results = results[1::2]
+
+    # Summary
+    print(_format_table("ROUND-TRIP RESULTS", rt_results))
+    print(_format_table("ONE-WAY RESULTS", ow_results))
 
     # Winners
     rt_bookable = [r for r in rt_results if r["book"]]
@@ -288,7 +411,6 @@ def main():
         print("\n  One-way: NO WORKING ROUTES FOUND")
 
     print()
-    delete_call_state(CALL_ID)
 
 
 if __name__ == "__main__":
@@ -6,9 +6,13 @@ import sys
 import json
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import date
+from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
 from signalwire_agents import AgentBase, AgentServer
 from signalwire_agents.core.function_result import SwaigFunctionResult
 
@@ -23,13 +27,12 @@ from mock_flight_api import (
 )
 from state_store import (
     load_call_state, save_call_state, delete_call_state,
+    set_call_state_flag, pop_call_state_fields,
     cleanup_stale_states, build_ai_summary, save_booking, get_all_bookings,
     get_passenger_by_phone, create_passenger, update_passenger,
 )
 
-load_dotenv()
-
-logging.basicConfig(level=logging.INFO, force=True)
+logging.basicConfig(level=config.LOG_LEVEL, force=True)
 logger = logging.getLogger(__name__)
 
 config.validate()
@@ -45,13 +48,220 @@ _price_offer = mock_price_offer
 _create_order = mock_create_order
 
 
-def _extract_segments(offer):
-    """Extract carrier+flight-number identifiers for segment matching."""
-    segs = []
-    for itin in offer.get("itineraries", []):
-        for seg in itin.get("segments", []):
-            segs.append(f"{seg.get('carrierCode', '')}{seg.get('number', '')}")
-    return segs
+@lru_cache(maxsize=2048)
+def _cached_search_airports(term):
+    """Memoized airport search for profile setup, keyed by a normalized term.
+
+    Airport metadata is static, so home-airport answers repeated across
+    callers skip the search entirely.  Callers must not mutate the results.
+    """
+    return tuple(_search_airports(term))
+
+
+# ── Google Maps geocoding ────────────────────────────────────────────
+
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
+# Retry 429/5xx with jittered exponential backoff, done by urllib3 on the
+# session's adapter.  The cap stays low because a caller is waiting on the
+# line; keyword search still works without coordinates, so giving up early
+# is cheap.
+_GEOCODE_RETRIES = 2
+_BACKOFF_BASE = 0.2
+_BACKOFF_JITTER = 0.2
+_BACKOFF_CAP = 2.0
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+# Circuit breaker: after GEOCODE_BREAKER_THRESHOLD consecutive failures,
+# skip geocoding for GEOCODE_BREAKER_COOLDOWN seconds instead of making
+# every caller sit through timeouts and backoff.  The failure count is
+# left at the threshold when the breaker opens, so a single failed probe
+# after the cool-down re-opens it and a single success closes it.
+_geocode_failures = 0
+_geocode_open_until = 0.0
+_geocode_breaker_lock = threading.Lock()
+
+# Place names resolve to the same coordinates for days; callers repeat
+# the big cities constantly.  Only successful lookups are cached so a
+# transient outage doesn't pin a miss for the whole TTL.
+_GEOCODE_CACHE_TTL = 24 * 3600
+_GEOCODE_CACHE_MAX = 1024
+_geocode_cache = OrderedDict()  # key -> (expires_at, result)
+_geocode_cache_lock = threading.Lock()
+
+# Single-flight: concurrent misses for the same key share one request.
+_geocode_inflight = {}  # key -> Future
+_geocode_inflight_lock = threading.Lock()
+
+# Shared pool for overlapping independent lookups inside a tool call.
+# Workers are spawned on demand, so this costs nothing until first use.
+_io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="voyager-io")
+
+
+def _get_http_session():
+    """Return the shared keep-alive session for outbound HTTP calls.
+
+    Reusing one pooled session skips the TCP + TLS handshake on every
+    geocode after the first.  Created lazily so requests stays off the
+    import path; double-checked under a lock so concurrent first calls
+    don't each build (and leak) their own pool.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                session.headers["User-Agent"] = "voyager/1.0"
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_http_retry())
+                session.mount("https://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def _http_retry():
+    """urllib3 retry policy for the shared session.
+
+    Retries stay on the pooled connection and honour Retry-After, clamped
+    to the backoff cap so a server asking for minutes can't park a caller.
+    raise_on_status=False hands the last response back so the circuit
+    breaker sees the final status.
+    """
+    from urllib3.util.retry import Retry
+
+    class _CappedRetry(Retry):
+        def parse_retry_after(self, retry_after):
+            return min(super().parse_retry_after(retry_after), _BACKOFF_CAP)
+
+    return _CappedRetry(
+        total=_GEOCODE_RETRIES,
+        backoff_factor=_BACKOFF_BASE,
+        backoff_jitter=_BACKOFF_JITTER,
+        backoff_max=_BACKOFF_CAP,
+        status_forcelist=_RETRY_STATUSES,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def _geocode_circuit_open():
+    return time.monotonic() < _geocode_open_until
+
+
+def _geocode_record(ok):
+    global _geocode_failures, _geocode_open_until
+    with _geocode_breaker_lock:
+        if ok:
+            _geocode_failures = 0
+            return
+        _geocode_failures += 1
+        if _geocode_failures >= config.GEOCODE_BREAKER_THRESHOLD:
+            _geocode_open_until = time.monotonic() + config.GEOCODE_BREAKER_COOLDOWN
+            logger.warning(
+                f"Google Geocoding failed {_geocode_failures} times in a row, "
+                f"pausing lookups for {config.GEOCODE_BREAKER_COOLDOWN:.0f}s"
+            )
+
+
+def _geocode_cache_key(location_text):
+    return " ".join(location_text.lower().split())
+
+
+def _geocode_cache_get(key):
+    with _geocode_cache_lock:
+        entry = _geocode_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _geocode_cache[key]
+            return None
+        _geocode_cache.move_to_end(key)
+        return dict(entry[1])
+
+
+def _geocode_cache_put(key, result):
+    with _geocode_cache_lock:
+        _geocode_cache[key] = (time.monotonic() + _GEOCODE_CACHE_TTL, result)
+        _geocode_cache.move_to_end(key)
+        while len(_geocode_cache) > _GEOCODE_CACHE_MAX:
+            _geocode_cache.popitem(last=False)
+
+
+def geocode_location(location_text):
+    """Use Google Geocoding API to get coordinates for a location.
+
+    Results are served from a TTL LRU cache keyed on the normalized text,
+    and concurrent misses for the same key wait on a single request.
+    """
+    key = _geocode_cache_key(location_text)
+    cached = _geocode_cache_get(key)
+    if cached is not None:
+        return cached
+
+    with _geocode_inflight_lock:
+        future = _geocode_inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _geocode_inflight[key] = Future()
+    if not leader:
+        result = future.result()
+        return dict(result) if result is not None else None
+
+    result = None
+    try:
+        result = _geocode_request(location_text)
+        if result is not None:
+            _geocode_cache_put(key, dict(result))
+    finally:
+        # Cache first, then unregister, so late arrivals hit the cache
+        with _geocode_inflight_lock:
+            del _geocode_inflight[key]
+        future.set_result(result)
+    return result
+
+
+def _geocode_request(location_text):
+    if _geocode_circuit_open():
+        logger.info("Google Geocoding circuit open, skipping lookup")
+        return None
+    try:
+        try:
+            resp = _get_http_session().get(
+                GEOCODE_URL,
+                params={
+                    "address": location_text,
+                    "key": config.GOOGLE_MAPS_API_KEY,
+                },
+                timeout=config.GEOCODE_TIMEOUT,
+            )
+        except OSError:  # requests' connection/timeout errors, after retries
+            _geocode_record(False)
+            raise
+        _geocode_record(resp.status_code not in _RETRY_STATUSES)
+        resp.raise_for_status()
+        data = resp.json()
+        status = data.get("status", "OK")
+        if status not in ("OK", "ZERO_RESULTS"):
+            # Google reports quota/key problems as 200 with an error status
+            logger.error(f"Google Geocoding status {status}: {data.get('error_message', '')}")
+            return None
+        results = data.get("results", [])
+        if not results:
+            return None
+        loc = results[0]["geometry"]["location"]
+        return {
+            "lat": loc["lat"],
+            "lng": loc["lng"],
+            "formatted": results[0].get("formatted_address", location_text),
+        }
+    except Exception as e:
+        logger.error(f"Google Geocoding failed: {e}")
+        return None
 
 
 def _extract_baggage(priced_offer):
@@ -72,6 +282,13 @@ def _extract_baggage(priced_offer):
     return "Carry-on only, checked bags extra. "
 
 
+# Precompiled patterns for IATA codes and phone numbers
+_IATA_PAREN_RE = re.compile(r"\(([A-Z]{3})\)")
+_IATA_WORD_RE = re.compile(r"\b([A-Z]{3})\b")
+_IATA_WORD_ANYCASE_RE = re.compile(r"\b([A-Za-z]{3})\b")
+_NON_DIGIT_RE = re.compile(r"[^\d]")
+
+
 # NATO phonetic alphabet for PNR readback
 NATO = {
     "A": "Alpha", "B": "Bravo", "C": "Charlie", "D": "Delta",
@@ -86,18 +303,40 @@ NATO = {
 }
 
 
+# Lowercase letters map directly so spelling needs no per-character upper()
+_NATO_SPOKEN = {**NATO, **{k.lower(): v for k, v in NATO.items() if k.isalpha()}}
+# Every visible ASCII character becomes a space-padded token (its NATO word,
+# or itself), so one C-level translate() plus split() does the whole string.
+_NATO_TRANS = str.maketrans({i: f" {_NATO_SPOKEN.get(chr(i), chr(i))} " for i in range(33, 127)})
+
+
 def nato_spell(text):
     """Convert a string to NATO phonetic spelling."""
-    return " ".join(NATO.get(c.upper(), c) for c in text if c.strip())
+    return " ".join(text.translate(_NATO_TRANS).split())
 
 
 def format_duration(iso_duration):
-    """Convert ISO 8601 duration (PT2H30M) to human-readable string."""
-    match = re.match(r"PT(?:(\d+)H)?(?:(\d+)M)?", iso_duration or "")
-    if not match:
-        return iso_duration or "unknown"
-    hours = int(match.group(1) or 0)
-    minutes = int(match.group(2) or 0)
+    """Convert ISO 8601 duration (PT2H30M) to human-readable string.
+
+    Hand-scanned rather than regex-matched: only the leading PT<h>H<m>M
+    part is read, anything after it (seconds) is ignored, and strings not
+    starting with PT are returned unchanged.
+    """
+    s = iso_duration or ""
+    if not s.startswith("PT"):
+        return s or "unknown"
+    n = len(s)
+    i = j = 2
+    while j < n and s[j].isdecimal():
+        j += 1
+    hours = minutes = 0
+    if i < j < n and s[j] == "H":
+        hours = int(s[i:j])
+        i = j = j + 1
+        while j < n and s[j].isdecimal():
+            j += 1
+    if i < j < n and s[j] == "M":
+        minutes = int(s[i:j])
     if hours and minutes:
         return f"{hours}h {minutes}m"
     elif hours:
@@ -122,8 +361,12 @@ def format_time_voice(hhmm):
         return hhmm
 
 
-def summarize_offer(offer, index, dictionaries):
-    """Summarize a flight offer into a voice-friendly string."""
+def summarize_offer(offer, index, carriers):
+    """Summarize a flight offer into a voice-friendly string.
+
+    carriers is the search response's code -> airline name map, resolved
+    once by the caller for all offers.
+    """
     try:
         price = offer.get("price", {})
         total = price.get("grandTotal") or price.get("total", "?")
@@ -145,7 +388,6 @@ def summarize_offer(offer, index, dictionaries):
             last_seg = segments[-1]
 
             carrier_code = first_seg.get("carrierCode", "")
-            carriers = dictionaries.get("carriers", {})
             airline = carriers.get(carrier_code, carrier_code)
 
             dep_time = first_seg.get("departure", {}).get("at", "")
@@ -167,6 +409,10 @@ def summarize_offer(offer, index, dictionaries):
         return f"Option {index}: details unavailable"
 
 
+# Server-side confirm guards cleared when a booking restarts
+_BOOKING_ASKED_FLAGS = ("_departure_date_asked", "_return_date_asked", "_trip_type_asked")
+
+
 class VoyagerAgent(AgentBase):
     """Voyager - AI Travel Concierge"""
 
@@ -261,10 +507,7 @@ class VoyagerAgent(AgentBase):
                 call_id = ((raw_data or {}).get("call_id", "unknown")
                            if isinstance(raw_data, dict) else "unknown")
                 asked_key = f"_{_key_name}_asked"
-                _state = load_call_state(call_id)
-                if not _state.get(asked_key):
-                    _state[asked_key] = True
-                    save_call_state(call_id, _state)
+                if set_call_state_flag(call_id, asked_key):
                     return SwaigFunctionResult(
                         f"Ask the caller for their {_key_name.replace('_', ' ')}. "
                         f"Then call {_tool_name} with their answer and confirmed set to true."
@@ -275,8 +518,7 @@ class VoyagerAgent(AgentBase):
                         f"Then call {_tool_name} again with confirmed set to true."
                     )
                 # Clear the asked flag on successful confirmation
-                _state.pop(asked_key, None)
-                save_call_state(call_id, _state)
+                pop_call_state_fields(call_id, asked_key)
 
             if not value:
                 return SwaigFunctionResult("No answer provided.")
@@ -543,11 +785,12 @@ class VoyagerAgent(AgentBase):
             # Extract or lookup IATA code
             home_airport_iata = None
             home_airport_full_name = home_airport_value
+            airport = None
 
             # First try to extract existing IATA code from answer
-            iata_match = re.search(r"\(([A-Z]{3})\)", home_airport_value)
+            iata_match = _IATA_PAREN_RE.search(home_airport_value)
             if not iata_match:
-                iata_match = re.search(r"\b([A-Z]{3})\b", home_airport_value)
+                iata_match = _IATA_WORD_RE.search(home_airport_value)
 
             if iata_match:
                 home_airport_iata = iata_match.group(1).upper()
@@ -561,9 +804,8 @@ class VoyagerAgent(AgentBase):
                     city_part = home_airport_value.split(",")[0].strip()
                     search_terms.append(city_part)
 
-                airport_results = None
                 for term in search_terms:
-                    airport_results = _search_airports(term)
+                    airport_results = _cached_search_airports(term.strip().lower())
                     if airport_results:
                         airport = airport_results[0]
                         home_airport_iata = airport.get("iataCode", "").upper()
@@ -571,11 +813,14 @@ class VoyagerAgent(AgentBase):
                         logger.info(f"save_profile: looked up '{home_airport_value}' (searched: '{term}') -> {home_airport_iata}")
                         break
 
-            # Validate and set home airport as origin
+            # Validate and set home airport as origin; a by-name match above
+            # already is the airport record, so only a bare code is looked up.
             if home_airport_iata:
-                airport_results = _search_airports(home_airport_iata)
-                if airport_results:
-                    airport = airport_results[0]  # Take first match
+                if airport is None:
+                    airport_results = _cached_search_airports(home_airport_iata.lower())
+                    if airport_results:
+                        airport = airport_results[0]  # Take first match
+                if airport:
                     state["origin"] = {
                         "iata": airport.get("iataCode", home_airport_iata),
                         "name": airport.get("name", "").title(),
@@ -817,33 +1062,6 @@ class VoyagerAgent(AgentBase):
             """Return the correct booking gather step name based on trip type."""
             return "collect_booking_roundtrip" if state.get("trip_type") == "round_trip" else "collect_booking_oneway"
 
-        # --- Google Maps helpers for geocoding ---
-        def geocode_location(location_text):
-            """Use Google Geocoding API to get coordinates for a location."""
-            try:
-                import requests as _requests
-                resp = _requests.get(
-                    "https://maps.googleapis.com/maps/api/geocode/json",
-                    params={
-                        "address": location_text,
-                        "key": config.GOOGLE_MAPS_API_KEY,
-                    }
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                results = data.get("results", [])
-                if not results:
-                    return None
-                loc = results[0]["geometry"]["location"]
-                return {
-                    "lat": loc["lat"],
-                    "lng": loc["lng"],
-                    "formatted": results[0].get("formatted_address", location_text),
-                }
-            except Exception as e:
-                logger.error(f"Google Geocoding failed: {e}")
-                return None
-
         # 1. RESOLVE LOCATION
         @self.tool(
             name="resolve_location",
@@ -897,14 +1115,16 @@ class VoyagerAgent(AgentBase):
                     "Origin airport must be set before destination.\nAsk the caller where they're flying from first."
                 )
 
-            # Step 1: Google Geocoding for coordinates
-            geo = geocode_location(location_text)
+            # Step 1: Google Geocoding for coordinates — runs on the I/O pool
+            # while the keyword search below is in flight (they're independent).
+            geo_future = _io_pool.submit(geocode_location, location_text)
 
             # Step 2: Amadeus keyword search
             # Amadeus keyword API rejects long strings like "Miami, Florida" —
             # strip qualifiers after commas and keep just the city/airport name.
             keyword = location_text.split(",")[0].strip()
             keyword_results = _search_airports(keyword)
+            geo = geo_future.result()
 
             # Step 3: Amadeus proximity search (if we have coordinates)
             proximity_results = []
@@ -1190,9 +1410,9 @@ class VoyagerAgent(AgentBase):
             # Extract home airport IATA — try "(SFO)" format, then bare 3-letter code
             home_airport_name = fields.get("home_airport_name") or ""
             home_airport_iata = None
-            iata_match = re.search(r"\(([A-Z]{3})\)", home_airport_name)
+            iata_match = _IATA_PAREN_RE.search(home_airport_name)
             if not iata_match:
-                iata_match = re.search(r"\b([A-Za-z]{3})\b", home_airport_name)
+                iata_match = _IATA_WORD_ANYCASE_RE.search(home_airport_name)
             if iata_match:
                 home_airport_iata = iata_match.group(1).upper()
 
@@ -1396,9 +1616,10 @@ class VoyagerAgent(AgentBase):
                 )
                 state["cabin_class"] = actual_cabin
 
+            carriers = (dictionaries or {}).get("carriers", {})
             summaries = []
             for i, offer in enumerate(offers):
-                summaries.append(summarize_offer(offer, i + 1, dictionaries))
+                summaries.append(summarize_offer(offer, i + 1, carriers))
 
             state["flight_offers"] = offers
             state["flight_summaries"] = summaries
@@ -1501,8 +1722,9 @@ class VoyagerAgent(AgentBase):
             state["flight_summary"] = flight_summaries[idx] if idx < len(flight_summaries) else None
             selected = flight_offers[idx]
             logger.info(f"select_flight: caller chose option {option_number}, "
-                        f"offer id={selected.get('id') if isinstance(selected, dict) else 'N/A'}, "
-                        f"keys={sorted(selected.keys()) if isinstance(selected, dict) else 'N/A'}")
+                        f"offer id={selected.get('id') if isinstance(selected, dict) else 'N/A'}")
+            if logger.isEnabledFor(logging.DEBUG) and isinstance(selected, dict):
+                logger.debug(f"select_flight: offer keys={sorted(selected)}")
 
             result = SwaigFunctionResult(f"Flight selected.\nOption {option_number}.")
             save_call_state(call_id, state)
@@ -1533,10 +1755,7 @@ class VoyagerAgent(AgentBase):
             call_id = _call_id(raw_data)
             # Clear booking asked flags so server-side guards re-fire on re-entry
             state = load_call_state(call_id)
-            for flag in ["_departure_date_asked", "_return_date_asked",
-                         "_trip_type_asked"]:
-                state.pop(flag, None)
-            save_call_state(call_id, state)
+            pop_call_state_fields(call_id, *_BOOKING_ASKED_FLAGS)
 
             if reason == "different_route":
                 result = SwaigFunctionResult("Restarting — new route.")
@@ -1557,10 +1776,7 @@ class VoyagerAgent(AgentBase):
         def restart_booking(args, raw_data):
             call_id = _call_id(raw_data)
             state = load_call_state(call_id)
-            for flag in ["_departure_date_asked", "_return_date_asked",
-                         "_trip_type_asked"]:
-                state.pop(flag, None)
-            save_call_state(call_id, state)
+            pop_call_state_fields(call_id, *_BOOKING_ASKED_FLAGS)
             result = SwaigFunctionResult("Restarting booking — new dates. Trip type preserved.")
             _change_step(result, _booking_step(state))
             return result
@@ -1738,7 +1954,7 @@ class VoyagerAgent(AgentBase):
                     "phones": [{
                         "deviceType": "MOBILE",
                         "countryCallingCode": "1",
-                        "number": re.sub(r"[^\d]", "", phone),
+                        "number": _NON_DIGIT_RE.sub("", phone),
                     }],
                 },
             }]
@@ -1880,8 +2096,14 @@ class VoyagerAgent(AgentBase):
             return SwaigFunctionResult(json.dumps(summary_data))
 
     def _render_swml(self, call_id=None, modifications=None):
-        """Override to dump the generated SWML to stderr for debugging."""
+        """Override to dump the generated SWML to stderr when DEBUG is on.
+
+        The pretty-printed document is tens of KB, so it is only built
+        when LOG_LEVEL=DEBUG rather than on every request.
+        """
         swml = super()._render_swml(call_id, modifications)
+        if not logger.isEnabledFor(logging.DEBUG):
+            return swml
         try:
             parsed = json.loads(swml) if isinstance(swml, str) else swml
             print(json.dumps(parsed, indent=2, default=str), file=sys.stderr)
@@ -1944,9 +2166,9 @@ def create_server():
         }
 
     @server.app.get("/api/bookings")
-    def api_bookings():
-        """Return all bookings for the dashboard."""
-        return {"bookings": get_all_bookings()}
+    def api_bookings(limit: int | None = None, offset: int = 0):
+        """Return bookings for the dashboard, optionally one page at a time."""
+        return {"bookings": get_all_bookings(limit=limit, offset=offset)}
 
     # Serve static files from web/ directory
     web_dir = Path(__file__).parent / "web"